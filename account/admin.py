@@ -5,3 +5,16 @@ from . import models
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "date_of_birth", "photo")
     raw_id_fields = ("user", )
+
+@admin.register(models.UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "user", "images_created", "followers", "following", "likes_given"
+    )
+    raw_id_fields = ("user", )
+
+@admin.register(models.OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("from_email", "recipients", "status", "attempts", "created")
+    list_filter = ("status", )
+    exclude = ("message", )
@@ -4,4 +4,10 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
-    verbose_name = "Профиль"
\ No newline at end of file
+    verbose_name = "Профиль"
+
+    def ready(self):
+        """
+        Подключение сигналов к приложению.
+        """
+        import account.signals
@@ -0,0 +1,93 @@
+"""
+Нормализация аватаров пользователей.
+
+Загруженное фото декодируется один раз, поворачивается согласно EXIF,
+обрезается по центру до квадрата и сохраняется в фиксированных размерах
+`settings.AVATAR_SIZES` в поля `Profile.photo_<имя размера>`. Большие файлы
+обрабатываются в фоновом потоке после фиксации транзакции.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def render_variants(source, sizes):
+    """
+    Возвращает словарь {имя размера: JPEG-байты} для изображения `source`
+    (путь или файловый объект). Не обращается к БД, поэтому может
+    выполняться в отдельном процессе.
+    """
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        variants = {}
+        for name, size in sizes.items():
+            variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            variant.save(buffer, "JPEG", quality=85, optimize=True)
+            variants[name] = buffer.getvalue()
+    return variants
+
+
+def apply_variants(profile, variants):
+    """
+    Сохраняет нормализованные копии в профиль, удаляя предыдущие файлы.
+    Пустой словарь очищает все копии. В имя файла входит хэш содержимого:
+    медиафайлы кэшируются браузером, и новое фото должно получить новый URL.
+    """
+    fields = []
+    for name in settings.AVATAR_SIZES:
+        field = getattr(profile, f"photo_{name}")
+        if field:
+            field.delete(save=False)
+        if name in variants:
+            digest = hashlib.md5(variants[name]).hexdigest()[:12]
+            field.save(
+                f"{profile.user_id}_{name}_{digest}.jpg",
+                ContentFile(variants[name]),
+                save=False
+            )
+        fields.append(f"photo_{name}")
+    profile.save(update_fields=fields)
+
+
+def normalize_avatar(profile):
+    if not profile.photo:
+        apply_variants(profile, {})
+        return
+    with profile.photo.open("rb") as source:
+        variants = render_variants(source, settings.AVATAR_SIZES)
+    apply_variants(profile, variants)
+
+
+def _normalize_in_background(profile_id):
+    try:
+        profile = Profile.objects.filter(pk=profile_id).first()
+        if profile:
+            normalize_avatar(profile)
+    except Exception:
+        # Иначе исключение осталось бы незамеченным в объекте Future.
+        logger.exception("Ошибка нормализации аватара профиля %s", profile_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_normalization(profile):
+    """
+    Нормализует фото профиля: небольшие файлы - сразу, файлы больше
+    `AVATAR_SYNC_MAX_SIZE` байт - в фоне после фиксации транзакции.
+    """
+    if profile.photo and profile.photo.size > settings.AVATAR_SYNC_MAX_SIZE:
+        transaction.on_commit(
+            lambda: _executor.submit(_normalize_in_background, profile.pk)
+        )
+    else:
+        normalize_avatar(profile)
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+from .utils import get_user_stats
+
+
+def user_stats(request):
+    """
+    Счётчики текущего пользователя для шаблонов (`user_stats`).
+    Запрос к БД выполняется только при обращении к ним из шаблона.
+    """
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        "user_stats": SimpleLazyObject(lambda: get_user_stats(request.user))
+    }
@@ -0,0 +1,58 @@
+from email.message import Message
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import DatabaseError
+from .models import OutboxMessage
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Бэкенд почты, который не подключается к SMTP, а сохраняет письма в
+    таблицу `OutboxMessage` и сразу возвращает управление. Письма
+    отправляет команда `send_outbox` (настройка `OUTBOX_SMTP_BACKEND`).
+    """
+    def send_messages(self, email_messages):
+        rows = [
+            OutboxMessage(
+                from_email=message.from_email,
+                recipients=message.recipients(),
+                message=message.message().as_bytes(linesep="\r\n"),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        try:
+            OutboxMessage.objects.bulk_create(rows)
+        except DatabaseError:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(rows)
+
+
+class StoredMIMEMessage(Message):
+    """
+    MIME-письмо, которое отдаёт сохранённые байты без повторной сборки.
+    """
+    def __init__(self, raw):
+        super().__init__()
+        self._raw = raw
+
+    def as_bytes(self, unixfrom=False, linesep="\n"):
+        return self._raw
+
+
+class StoredEmailMessage(EmailMessage):
+    """
+    Письмо из очереди `OutboxMessage` для `send_messages` любого бэкенда
+    почты.
+    """
+    def __init__(self, outbox_message):
+        super().__init__(
+            from_email=outbox_message.from_email,
+            to=outbox_message.recipients
+        )
+        self.raw = bytes(outbox_message.message)
+
+    def message(self, *args, **kwargs):
+        return StoredMIMEMessage(self.raw)
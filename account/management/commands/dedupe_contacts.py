@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Min
+from account.models import Contact
+
+
+class Command(BaseCommand):
+    """
+    Удаление повторяющихся подписок перед применением ограничения
+    уникальности `unique_contact`. Для каждой пары (user_from, user_to)
+    остаётся самая ранняя запись.
+    """
+    help = "Удаляет повторяющиеся подписки, оставляя самую раннюю."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Только вывести количество повторов, ничего не удаляя."
+        )
+
+    def handle(self, *args, **options):
+        duplicates = Contact.objects.values("user_from", "user_to").annotate(
+            keep_id=Min("id"), total=Count("id")
+        ).filter(total__gt=1).order_by()
+        removed = 0
+        for row in list(duplicates):
+            extra = Contact.objects.filter(
+                user_from=row["user_from"], user_to=row["user_to"]
+            ).exclude(id=row["keep_id"])
+            if options["dry_run"]:
+                removed += row["total"] - 1
+            else:
+                removed += extra.delete()[0]
+        if options["dry_run"]:
+            self.stdout.write(f"Повторяющихся подписок: {removed}.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Удалено повторяющихся подписок: {removed}.")
+        )
+        if removed:
+            self.stdout.write(
+                "Выполните recompute_user_stats для пересчёта счётчиков."
+            )
@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from account.avatars import apply_variants, render_variants
+from account.models import Profile
+
+
+class Command(BaseCommand):
+    """
+    Создание нормализованных аватаров для существующих профилей.
+
+    Декодирование и масштабирование выполняются в пуле процессов, запись
+    файлов и профилей - в основном процессе.
+    """
+    help = "Создаёт нормализованные копии фото для существующих профилей."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Количество процессов (по умолчанию - число ядер)."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Количество профилей в одной пачке."
+        )
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Обработать и уже нормализованные профили."
+        )
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(photo="").order_by("pk")
+        if not options["all"]:
+            profiles = profiles.filter(photo_small="")
+        batch_size = options["batch_size"]
+        # Соединения с БД не должны наследоваться дочерними процессами.
+        connections.close_all()
+        done = failed = 0
+        last_pk = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                batch = list(profiles.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                futures = [
+                    pool.submit(
+                        render_variants, profile.photo.path,
+                        settings.AVATAR_SIZES
+                    )
+                    for profile in batch
+                ]
+                for profile, future in zip(batch, futures):
+                    try:
+                        apply_variants(profile, future.result())
+                        done += 1
+                    except (OSError, ValueError) as e:
+                        failed += 1
+                        self.stderr.write(f"{profile}: {e}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработано: {done}, ошибок: {failed}.")
+        )
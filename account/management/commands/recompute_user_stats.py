@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from account.models import UserStats
+from account.utils import STATS_FIELDS, count_user_stats
+
+
+class Command(BaseCommand):
+    """
+    Пересчёт денормализованных счётчиков `UserStats` по исходным таблицам.
+    Используется для восстановления после сбоев или ручных правок БД.
+    """
+    help = "Пересчитывает счётчики UserStats для всех пользователей."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Количество записей в одном INSERT."
+        )
+
+    def handle(self, *args, **options):
+        stats = [
+            UserStats(user_id=user_id, **counts)
+            for user_id, counts in count_user_stats().items()
+        ]
+        UserStats.objects.bulk_create(
+            stats,
+            batch_size=options["batch_size"],
+            update_conflicts=True,
+            unique_fields=("user",),
+            update_fields=STATS_FIELDS,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано пользователей: {len(stats)}.")
+        )
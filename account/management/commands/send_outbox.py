@@ -0,0 +1,147 @@
+import datetime
+import smtplib
+import time
+import uuid
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from account.mail import StoredEmailMessage
+from account.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """
+    Отправка писем из очереди `OutboxMessage`.
+
+    Письма отправляются пачками, по одному SMTP-соединению на пачку.
+    Пачка закрепляется за обработчиком, поэтому можно запускать несколько
+    команд одновременно.
+    Неудачные попытки повторяются с экспоненциальной задержкой
+    (`OUTBOX_RETRY_DELAY`, удваивается с каждой попыткой), после
+    `OUTBOX_MAX_ATTEMPTS` попыток письмо помечается как неотправленное.
+    """
+    help = "Отправляет письма из очереди исходящих."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=50,
+            help="Количество писем на одно SMTP-соединение."
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Работать постоянно, проверяя очередь."
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5,
+            help="Пауза между проверками пустой очереди, в секундах."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.send_batch(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Обработано писем: {processed}.")
+            if not options["loop"]:
+                break
+            if not processed:
+                time.sleep(options["interval"])
+
+    def send_batch(self, batch_size):
+        """
+        Отправляет одну пачку писем. Возвращает количество обработанных.
+        """
+        batch = self.claim_batch(batch_size)
+        if not batch:
+            return 0
+        backend = get_connection(settings.OUTBOX_SMTP_BACKEND)
+        try:
+            backend.open()
+        except (OSError, smtplib.SMTPException) as e:
+            for message in batch:
+                self.schedule_retry(message, e)
+            self.save(batch)
+            return len(batch)
+
+        try:
+            for index, message in enumerate(batch):
+                try:
+                    backend.send_messages([StoredEmailMessage(message)])
+                except smtplib.SMTPServerDisconnected as e:
+                    # Соединение потеряно - остаток пачки ждёт следующей.
+                    self.retry_rest(batch[index:], e)
+                    break
+                except smtplib.SMTPException as e:
+                    # Ошибка конкретного письма (например, адрес отклонён).
+                    # SMTPException - подкласс OSError, поэтому проверяется
+                    # раньше сетевых ошибок.
+                    self.schedule_retry(message, e)
+                except OSError as e:
+                    self.retry_rest(batch[index:], e)
+                    break
+                else:
+                    message.status = OutboxMessage.Status.SENT
+                    message.sent = timezone.now()
+                    message.attempts += 1
+                    message.last_error = ""
+        finally:
+            try:
+                backend.close()
+            except (OSError, smtplib.SMTPException):
+                pass
+        self.save(batch)
+        return len(batch)
+
+    @staticmethod
+    def claim_batch(batch_size):
+        """
+        Забирает пачку писем условным UPDATE, чтобы параллельные обработчики
+        не отправили одно письмо дважды. Письма, забранные обработчиком,
+        который не завершил отправку, возвращаются в очередь через
+        `OUTBOX_CLAIM_TIMEOUT` секунд.
+        """
+        now = timezone.now()
+        ready = OutboxMessage.objects.filter(
+            status__in=(
+                OutboxMessage.Status.PENDING, OutboxMessage.Status.SENDING
+            ),
+            next_attempt__lte=now
+        )
+        ids = list(
+            ready.order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        claim = uuid.uuid4()
+        ready.filter(id__in=ids).update(
+            status=OutboxMessage.Status.SENDING,
+            claim=claim,
+            next_attempt=now + datetime.timedelta(
+                seconds=settings.OUTBOX_CLAIM_TIMEOUT
+            )
+        )
+        return list(OutboxMessage.objects.filter(claim=claim).order_by("id"))
+
+    def retry_rest(self, messages, error):
+        for message in messages:
+            self.schedule_retry(message, error)
+
+    @staticmethod
+    def schedule_retry(message, error):
+        message.attempts += 1
+        message.last_error = str(error)
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            message.status = OutboxMessage.Status.FAILED
+        else:
+            message.status = OutboxMessage.Status.PENDING
+            delay = settings.OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1)
+            message.next_attempt = (
+                timezone.now() + datetime.timedelta(seconds=delay)
+            )
+
+    @staticmethod
+    def save(batch):
+        OutboxMessage.objects.bulk_update(
+            batch,
+            ("status", "attempts", "next_attempt", "last_error", "sent")
+        )
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 class Profile(models.Model):
@@ -17,6 +18,14 @@ class Profile(models.Model):
     photo = models.ImageField(
         upload_to="users/%Y/%m/%d/", blank=True, verbose_name="Фото"
     )
+    # Нормализованные копии фото (см. account.avatars), шаблоны используют
+    # только их.
+    photo_small = models.ImageField(
+        upload_to="users/avatars/%Y/%m/%d/", blank=True, editable=False
+    )
+    photo_medium = models.ImageField(
+        upload_to="users/avatars/%Y/%m/%d/", blank=True, editable=False
+    )
 
     def __str__(self):
         return f"Профиль {self.user.username}"
@@ -25,6 +34,36 @@ class Profile(models.Model):
         verbose_name = "Профиль"
         verbose_name_plural = "Профили"
 
+class UserStats(models.Model):
+    """
+    Денормализованные счётчики пользователя. Обновляются атомарно через
+    `F()`-выражения (см. `account.utils.update_user_stats`), чтобы страницам
+    не приходилось выполнять COUNT по связующим таблицам.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name="stats", verbose_name="Пользователь"
+        )
+    images_created = models.PositiveIntegerField(
+        default=0, verbose_name="Добавлено изображений"
+        )
+    followers = models.PositiveIntegerField(
+        default=0, verbose_name="Подписчиков"
+        )
+    following = models.PositiveIntegerField(
+        default=0, verbose_name="Подписок"
+        )
+    likes_given = models.PositiveIntegerField(
+        default=0, verbose_name="Поставлено лайков"
+        )
+
+    def __str__(self):
+        return f"Статистика {self.user.username}"
+
+    class Meta:
+        verbose_name = "Статистика пользователя"
+        verbose_name_plural = "Статистика пользователей"
+
 class Contact(models.Model):
     user_from = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -39,14 +78,61 @@ class Contact(models.Model):
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user_from", "user_to"), name="unique_contact"
+            ),
+        )
         indexes = (
             models.Index(fields=("-created",)),
+            models.Index(fields=("user_to", "created")),
         )
         ordering = ("-created",)
 
     def __str__(self):
         return f"{self.user_from} follows {self.user_to}"
     
+class OutboxMessage(models.Model):
+    """
+    Письмо в очереди на отправку. Записывается бэкендом
+    `account.mail.OutboxEmailBackend` и отправляется командой `send_outbox`.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Ожидает отправки"
+        SENDING = "sending", "Отправляется"
+        SENT = "sent", "Отправлено"
+        FAILED = "failed", "Не отправлено"
+
+    from_email = models.CharField(max_length=254, verbose_name="Отправитель")
+    recipients = models.JSONField(verbose_name="Получатели")
+    message = models.BinaryField(verbose_name="Письмо (MIME)")
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING,
+        verbose_name="Статус"
+        )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Попыток"
+        )
+    next_attempt = models.DateTimeField(
+        default=timezone.now, verbose_name="Следующая попытка"
+        )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    # Метка обработчика `send_outbox`, забравшего письмо на отправку.
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=("status", "next_attempt")),
+        )
+        ordering = ("-created",)
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f"{self.from_email} -> {', '.join(self.recipients)}"
+
 user_model = get_user_model()
 user_model.add_to_class(
     "following",
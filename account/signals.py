@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from social_website.versions import bump_version
+from .models import Contact, Profile
+from .utils import user_cache
+
+User = get_user_model()
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def contact_changed(sender, **kwargs):
+    bump_version("contacts")
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def user_changed(sender, **kwargs):
+    bump_version("users")
+
+@receiver(pre_save, sender=User)
+def user_renaming(sender, instance, update_fields=None, **kwargs):
+    """
+    При смене username запоминает старое имя в `instance.old_username`
+    (иначе None; используется и сигналами других приложений) и сбрасывает
+    кэш по старому имени.
+    """
+    instance.old_username = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        "username", flat=True
+    ).first()
+    if old and old != instance.username:
+        instance.old_username = old
+        user_cache.invalidate_on_commit(old)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_cache_invalidate(sender, instance, **kwargs):
+    user_cache.invalidate_on_commit(instance.username)
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def profile_cache_invalidate(sender, instance, **kwargs):
+    try:
+        user_cache.invalidate_on_commit(instance.user.username)
+    except User.DoesNotExist:
+        # Профиль удалён вместе с пользователем, кэш уже сброшен.
+        pass
@@ -1,3 +1,118 @@
-from django.test import TestCase
+import socket
+import unittest
+from io import StringIO
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from .models import OutboxMessage
 
-# Create your tests here.
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """
+    Обработчик aiosmtpd: сохраняет принятые письма и отклоняет адреса,
+    начинающиеся с "bad@".
+    """
+    def __init__(self):
+        self.received = []
+
+    async def handle_RCPT(self, server, session, envelope, address,
+                          rcpt_options):
+        if address.startswith("bad@"):
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append(envelope)
+        return "250 OK"
+
+
+SMTP_SETTINGS = {
+    "EMAIL_BACKEND": "account.mail.OutboxEmailBackend",
+    "OUTBOX_SMTP_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+    "EMAIL_HOST": "127.0.0.1",
+    "EMAIL_HOST_USER": "",
+    "EMAIL_HOST_PASSWORD": "",
+    "EMAIL_USE_SSL": False,
+    "EMAIL_USE_TLS": False,
+}
+
+
+@unittest.skipIf(Controller is None, "aiosmtpd не установлен")
+class SendOutboxTests(TestCase):
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.port = free_port()
+        self.controller = Controller(
+            self.handler, hostname="127.0.0.1", port=self.port
+        )
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+        settings = override_settings(EMAIL_PORT=self.port, **SMTP_SETTINGS)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def send_outbox(self):
+        call_command("send_outbox", stdout=StringIO())
+
+    def test_queued_mail_is_sent(self):
+        mail.send_mail("Тема", "Текст", "from@example.com", ["to@example.com"])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(self.handler.received, [])
+
+        self.send_outbox()
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.Status.SENT)
+        self.assertEqual(message.last_error, "")
+        self.assertEqual(len(self.handler.received), 1)
+        self.assertIn(b"Subject: =?utf-8?", self.handler.received[0].content)
+
+    def test_rejected_recipient_does_not_block_batch(self):
+        for recipient in ("one", "bad", "two", "three"):
+            mail.send_mail(
+                "Тема", "Текст", "from@example.com",
+                [f"{recipient}@example.com"]
+            )
+
+        self.send_outbox()
+
+        statuses = dict(
+            OutboxMessage.objects.values_list("recipients__0", "status")
+        )
+        self.assertEqual(statuses, {
+            "one@example.com": OutboxMessage.Status.SENT,
+            "bad@example.com": OutboxMessage.Status.PENDING,
+            "two@example.com": OutboxMessage.Status.SENT,
+            "three@example.com": OutboxMessage.Status.SENT,
+        })
+        failed = OutboxMessage.objects.get(
+            status=OutboxMessage.Status.PENDING
+        )
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("bad@example.com", failed.last_error)
+        self.assertEqual(len(self.handler.received), 3)
+
+    def test_unreachable_server_retries_whole_batch(self):
+        mail.send_mail("Тема", "Текст", "from@example.com", ["to@example.com"])
+
+        with override_settings(EMAIL_PORT=free_port()):
+            self.send_outbox()
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertTrue(message.last_error)
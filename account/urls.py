@@ -42,10 +42,15 @@ urlpatterns = [
         name="password_reset_complete"
         ),
     path("", views.dashboard, name="dashboard"),
+    path("feed/stream/", views.feed_stream, name="feed_stream"),
     path("register/", views.register, name="register"),
     path("edit/", views.edit, name="edit"),
     path("users/", views.user_list, name="user_list"),
     path("users/follow/", views.user_follow, name="user_follow"),
+    path(
+        "users/follow/bulk/", views.user_follow_bulk,
+        name="user_follow_bulk"
+        ),
     path("users/<str:username>/", views.user_detail, name="user_detail"),
 
 ]
@@ -0,0 +1,174 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from social_website.model_cache import ModelCache
+from social_website.versions import bump_version
+from .models import Contact, UserStats
+
+User = get_user_model()
+
+
+def load_user(username):
+    # Хэш пароля в общий кэш не попадает.
+    return User.objects.select_related("profile").defer("password").filter(
+        username=username
+    ).first()
+
+
+# Пользователи по username (см. social_website.model_cache), инвалидируются
+# сигналами account.signals.
+user_cache = ModelCache("user", load_user)
+
+
+STATS_FIELDS = ("images_created", "followers", "following", "likes_given")
+
+
+def count_by(queryset, field):
+    """
+    Словарь {id пользователя: количество записей} одной группировкой.
+    """
+    rows = queryset.values(field).annotate(total=Count("pk")).order_by()
+    return {row[field]: row["total"] for row in rows}
+
+
+def count_user_stats(user_ids=None):
+    """
+    Точные значения счётчиков по исходным таблицам: словарь
+    {id пользователя: {поле: значение}} для пользователей `user_ids`
+    (для всех, если не указаны).
+    """
+    from images.models import Image
+
+    def by_user(queryset, field):
+        if user_ids is not None:
+            queryset = queryset.filter(**{f"{field}_id__in": user_ids})
+        return count_by(queryset, field)
+
+    counts = {
+        "images_created": by_user(Image.objects, "user"),
+        "followers": by_user(Contact.objects, "user_to"),
+        "following": by_user(Contact.objects, "user_from"),
+        "likes_given": by_user(Image.users_like.through.objects, "user"),
+    }
+    if user_ids is None:
+        user_ids = User.objects.values_list("id", flat=True)
+    return {
+        user_id: {
+            field: counts[field].get(user_id, 0) for field in STATS_FIELDS
+        }
+        for user_id in user_ids
+    }
+
+
+def get_user_stats(user):
+    """
+    Возвращает счётчики пользователя. Отсутствующая запись создаётся
+    со значениями, посчитанными по исходным таблицам.
+    """
+    stats = UserStats.objects.filter(user=user).first()
+    if stats is None:
+        stats, _ = UserStats.objects.get_or_create(
+            user=user, defaults=count_user_stats([user.id])[user.id]
+        )
+    return stats
+
+
+def update_user_stats(user_id, **deltas):
+    """
+    Атомарное изменение счётчиков пользователя, например:
+    `update_user_stats(user.id, followers=1)`. Значения не опускаются
+    ниже нуля. Если записи ещё нет, она создаётся по исходным таблицам
+    (изменение к этому моменту уже в них отражено).
+    """
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        }
+    )
+    if not updated:
+        UserStats.objects.get_or_create(
+            user_id=user_id, defaults=count_user_stats([user_id])[user_id]
+        )
+
+
+def follow_users(user, user_ids):
+    """
+    Подписывает пользователя `user` на активных пользователей `user_ids`
+    одним INSERT (уже существующие подписки пропускаются).
+    Действия в ленту не создаются. Возвращает множество id новых подписок.
+    """
+    user_ids = set(
+        User.objects.filter(id__in=user_ids, is_active=True).exclude(
+            id=user.id
+        ).values_list("id", flat=True)
+    )
+    existing = Contact.objects.filter(
+        user_from=user, user_to_id__in=user_ids
+    ).values_list("user_to_id", flat=True)
+    new_ids = user_ids - set(existing)
+    if not new_ids:
+        return new_ids
+    Contact.objects.bulk_create(
+        [Contact(user_from=user, user_to_id=user_id) for user_id in new_ids],
+        ignore_conflicts=True
+    )
+    # Часть подписок могла быть создана параллельным запросом, поэтому
+    # счётчики пересчитываются, а не увеличиваются на len(new_ids).
+    refresh_user_counts("following", [user.id])
+    refresh_user_counts("followers", new_ids)
+    # bulk_create не отправляет сигналы post_save.
+    bump_version("contacts")
+    return new_ids
+
+
+def unfollow_users(user, user_ids):
+    """
+    Отписывает пользователя `user` от пользователей `user_ids` одним DELETE.
+    Возвращает множество id удалённых подписок.
+    """
+    contacts = Contact.objects.filter(user_from=user, user_to_id__in=user_ids)
+    removed_ids = set(contacts.values_list("user_to_id", flat=True))
+    if removed_ids:
+        contacts.filter(user_to_id__in=removed_ids).delete()
+        refresh_user_counts("following", [user.id])
+        refresh_user_counts("followers", removed_ids)
+    return removed_ids
+
+
+def refresh_user_counts(field, user_ids):
+    """
+    Пересчитывает счётчик `field` (см. `STATS_FIELDS`) пользователей
+    `user_ids` одним UPDATE с подзапросом к исходной таблице.
+    В отличие от приращений, точные значения не расходятся при
+    одновременных запросах. Отсутствующие записи создаются по исходным
+    таблицам.
+    """
+    from images.models import Image
+
+    source, column = {
+        "images_created": (Image, "user"),
+        "followers": (Contact, "user_to"),
+        "following": (Contact, "user_from"),
+        "likes_given": (Image.users_like.through, "user"),
+    }[field]
+    existing = set(
+        UserStats.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", flat=True
+        )
+    )
+    UserStats.objects.bulk_create(
+        [
+            UserStats(user_id=user_id, **stats)
+            for user_id, stats in count_user_stats(
+                set(user_ids) - existing
+            ).items()
+        ],
+        ignore_conflicts=True
+    )
+    total = source.objects.filter(**{column: OuterRef("user_id")}).values(
+        column
+    ).annotate(total=Count("pk")).values("total")
+    UserStats.objects.filter(user_id__in=user_ids).update(
+        **{field: Coalesce(Subquery(total), 0)}
+    )
@@ -2,14 +2,26 @@ from venv import create
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth import login, authenticate, get_user_model
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_POST, condition
+from django.http import Http404, HttpResponse, JsonResponse
 from django.contrib import messages
+from django.conf import settings
 from .forms import (
     LoginForm, UserRegistrationForm, UserEditForm, ProfileEditForm
     )
+from .avatars import schedule_normalization
 from .models import Profile, Contact
-from actions.utils import create_action
+from .utils import (
+    get_user_stats, update_user_stats, follow_users, unfollow_users,
+    user_cache
+    )
+from actions.utils import create_action, coalesce_actions, render_actions
+from actions.events import (
+    event_stream_response, events_available, events_unavailable_response,
+    feed_channel
+    )
+from social_website.ratelimit import ratelimit
+from social_website.versions import get_versions, page_etag
 from actions.models import Action
 
 User = get_user_model()
@@ -80,12 +92,18 @@ def dashboard(request):
     following_ids = request.user.following.values_list('id', flat=True)
     if following_ids:
         actions = actions.filter(user_id__in=following_ids)
-        actions = actions.select_related(
-            "user", "user__profile"
-            ).prefetch_related("target")[:10]
+    # Одинаковые действия (например, лайки одного изображения) сворачиваются
+    # в одну запись в пределах окна из последних FEED_WINDOW_SIZE действий.
+    # Профили и цели подгружаются только для фрагментов, которых нет в кэше.
+    actions = actions.select_related("user")[:settings.FEED_WINDOW_SIZE]
+    fragments = render_actions(coalesce_actions(actions))
     return render(
         request, "account/dashboard.html",
-        {"section": "dashboard", "actions": actions}
+        {
+            "section": "dashboard",
+            "fragments": fragments,
+            "events_enabled": events_available(request),
+        }
     )
 
 @login_required
@@ -108,7 +126,9 @@ def edit(request):
         )
         if user_form.is_valid() and profile_form.is_valid():
             user_form.save()
-            profile_form.save()
+            profile = profile_form.save()
+            if "photo" in profile_form.changed_data:
+                schedule_normalization(profile)
             messages.success(
                 request,
                 "Профиль успешно обговлён!"
@@ -126,20 +146,38 @@ def edit(request):
 
 @login_required
 def user_list(request):
-    users = User.objects.filter(is_active=True)
+    users = User.objects.filter(is_active=True).select_related("profile")
     return render(
         request, "account/list.html", {"section": "people", "users": users}
         )
 
+def user_detail_etag(request, username):
+    """
+    ETag страницы пользователя: версии пользователей, подписок и изображений
+    и текущий пользователь (от него зависит кнопка подписки).
+    """
+    return page_etag(request, get_versions("users", "contacts", "images"))
+
 @login_required
+@condition(etag_func=user_detail_etag)
 def user_detail(request, username):
-    user = get_object_or_404(User, username=username, is_active=True)
-    return render(
-        request, "account/detail.html", {"section": "people", "user": user}
-    )
+    user = user_cache.get(username)
+    if user is None or not user.is_active:
+        raise Http404("Пользователь не найден.")
+    is_following = Contact.objects.filter(
+        user_from=request.user, user_to=user
+    ).exists()
+    context = {
+        "section": "people",
+        "user": user,
+        "stats": get_user_stats(user),
+        "is_following": is_following,
+    }
+    return render(request, "account/detail.html", context)
 
 @login_required
 @require_POST
+@ratelimit("account.follow")
 def user_follow(request):
     user_id = request.POST.get("id")
     action = request.POST.get("action")
@@ -147,19 +185,63 @@ def user_follow(request):
         try:
             user = get_object_or_404(User, id=user_id)
             if action == "follow":
-                Contact.objects.get_or_create(
+                _, created = Contact.objects.get_or_create(
                     user_from=request.user, user_to=user
                     )
+                if created:
+                    update_user_stats(request.user.id, following=1)
+                    update_user_stats(user.id, followers=1)
                 create_action(request.user, "Подписался", user)
             elif action == "unfollow":
-                Contact.objects.filter(
+                deleted, _ = Contact.objects.filter(
                     user_from=request.user, user_to=user
                 ).delete()
+                if deleted:
+                    update_user_stats(request.user.id, following=-1)
+                    update_user_stats(user.id, followers=-1)
             return JsonResponse({"status": "ok"})
         except User.DoesNotExist:
             return JsonResponse({"status": "error"})
     return JsonResponse({"status": "error"})
-            
 
+@login_required
+@require_POST
+@ratelimit("account.follow")
+def user_follow_bulk(request):
+    """
+    Подписка или отписка сразу от нескольких пользователей, например при
+    синхронизации контактов. Параметры POST: `ids` (повторяющийся, не более
+    `FOLLOW_BULK_MAX_IDS`) и `action` ("follow" или "unfollow"). В ответе -
+    id изменённых подписок.
+    """
+    user_ids = {
+        int(user_id) for user_id in request.POST.getlist("ids")
+        if user_id.isdigit()
+    }
+    if len(user_ids) > settings.FOLLOW_BULK_MAX_IDS:
+        return JsonResponse(
+            {"status": "error", "error": "too_many_ids"}, status=400
+        )
+    action = request.POST.get("action")
+    if user_ids and action == "follow":
+        changed = follow_users(request.user, user_ids)
+    elif user_ids and action == "unfollow":
+        changed = unfollow_users(request.user, user_ids)
+    else:
+        return JsonResponse({"status": "error"})
+    return JsonResponse({"status": "ok", "changed": sorted(changed)})
 
-        
+@login_required
+async def feed_stream(request):
+    """
+    Поток Server-Sent Events с новыми действиями пользователей, на которых
+    подписан текущий пользователь. Требует запуска под ASGI.
+    """
+    if not events_available(request):
+        return events_unavailable_response()
+    user = await request.auser()
+    channels = [
+        feed_channel(user_id)
+        async for user_id in user.following.values_list("id", flat=True)
+    ]
+    return event_stream_response(channels)
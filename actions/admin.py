@@ -1,8 +1,24 @@
 from django.contrib import admin
-from .models import Action
+from social_website.paginators import CachedCountPaginator
+from .models import Action, ActionSummary
 
 @admin.register(Action)
 class ActionAdmin(admin.ModelAdmin):
     list_display = ("user", "verb", "target", "created")
-    list_filter = ("created", )
+    list_select_related = ("user", "target_ct")
     search_fields = ("verb",)
+    date_hierarchy = "created"
+    autocomplete_fields = ("user", )
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Цели (GenericForeignKey) подгружаются одним запросом на тип
+        # содержимого для всей страницы списка.
+        return super().get_queryset(request).prefetch_related("target")
+
+@admin.register(ActionSummary)
+class ActionSummaryAdmin(admin.ModelAdmin):
+    list_display = ("user", "verb", "month", "count")
+    list_filter = ("month", )
+    raw_id_fields = ("user", )
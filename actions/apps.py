@@ -5,3 +5,9 @@ class ActionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'actions'
     verbose_name = "Действия"
+
+    def ready(self):
+        """
+        Подключение сигналов к приложению.
+        """
+        import actions.signals
@@ -0,0 +1,188 @@
+"""
+Рассылка событий в реальном времени (Server-Sent Events).
+
+Публикация выполняется синхронно из обычных представлений, подписка -
+асинхронно из потоковых представлений под ASGI. Каждый процесс держит одно
+соединение pub/sub с Redis и раздаёт сообщения локальным подписчикам через
+очереди asyncio, поэтому открытый поток почти ничего не стоит.
+"""
+import asyncio
+import json
+from collections import defaultdict
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from social_website.redis_client import guarded
+
+
+def like_channel(image_id):
+    return f"image:{image_id}:likes"
+
+
+def feed_channel(user_id):
+    return f"user:{user_id}:actions"
+
+
+class LocalBroker:
+    """
+    Брокер в пределах одного процесса. Используется для локальной разработки
+    и тестов, а также как основа для `RedisBroker`.
+    """
+    def __init__(self):
+        # канал -> множество пар (цикл событий, очередь подписчика)
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, data):
+        self._dispatch(channel, json.dumps(data))
+
+    def _dispatch(self, channel, message):
+        for loop, queue in list(self._subscribers.get(channel, ())):
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def _on_subscribe(self, channels):
+        pass
+
+    async def _on_unsubscribe(self, channels):
+        pass
+
+    async def listen(self, channels, keepalive=15):
+        """
+        Асинхронный генератор сообщений из каналов `channels`.
+        Если за `keepalive` секунд сообщений не было, возвращает None, чтобы
+        поток мог отправить клиенту комментарий-пинг.
+        """
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        new_channels = [c for c in channels if not self._subscribers.get(c)]
+        for channel in channels:
+            self._subscribers[channel].add(entry)
+        await self._on_subscribe(new_channels)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(entry[1].get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            unused = []
+            for channel in channels:
+                self._subscribers[channel].discard(entry)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+                    unused.append(channel)
+            await self._on_unsubscribe(unused)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Брокер поверх Redis pub/sub. На процесс открывается одно соединение
+    подписки, каналы подписываются по мере появления локальных слушателей.
+    """
+    def __init__(self, host, port, db, connect_timeout=None):
+        super().__init__()
+        self._params = {
+            "host": host, "port": port, "db": db,
+            "socket_connect_timeout": connect_timeout,
+        }
+        self._pubsub = None
+        self._reader = None
+
+    def publish(self, channel, data):
+        # Живые обновления не должны ломать или задерживать основной запрос,
+        # поэтому публикация идёт через общий клиент с выключателем.
+        guarded(lambda client: client.publish(channel, json.dumps(data)))
+
+    async def _on_subscribe(self, channels):
+        if not channels:
+            return
+        if self._pubsub is None:
+            client = redis.asyncio.Redis(**self._params)
+            self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(*channels)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _on_unsubscribe(self, channels):
+        if channels and self._pubsub is not None:
+            await self._pubsub.unsubscribe(*channels)
+
+    async def _read(self):
+        while self._subscribers:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        self._dispatch(
+                            message["channel"].decode(),
+                            message["data"].decode()
+                        )
+            except redis.RedisError:
+                # При переподключении подписки восстанавливаются redis-py.
+                pass
+            await asyncio.sleep(1)
+
+
+_broker = None
+
+
+def get_broker():
+    """
+    Брокер событий процесса, выбирается настройкой `EVENTS_BROKER`
+    ("redis" или "local").
+    """
+    global _broker
+    if _broker is None:
+        if settings.EVENTS_BROKER == "local":
+            _broker = LocalBroker()
+        else:
+            _broker = RedisBroker(
+                settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_DB,
+                connect_timeout=settings.REDIS_CONNECT_TIMEOUT
+            )
+    return _broker
+
+
+def publish(channel, data):
+    """
+    Публикует событие. При выключенных потоках (`EVENTS_ENABLED`) ничего
+    не делает: подписчиков быть не может.
+    """
+    if settings.EVENTS_ENABLED:
+        get_broker().publish(channel, data)
+
+
+async def _event_stream(channels):
+    async for message in get_broker().listen(channels):
+        if message is None:
+            yield ": keepalive\n\n"
+        else:
+            yield f"data: {message}\n\n"
+
+
+def events_available(request):
+    """
+    Потоки событий доступны, только если они включены настройкой
+    `EVENTS_ENABLED` и запрос обслуживает ASGI-сервер. Под WSGI бесконечный
+    поток занял бы рабочий поток навсегда.
+    """
+    return settings.EVENTS_ENABLED and isinstance(request, ASGIRequest)
+
+
+def events_unavailable_response():
+    return JsonResponse(
+        {"status": "error", "error": "events_unavailable"}, status=503
+    )
+
+
+def event_stream_response(channels):
+    """
+    Потоковый ответ `text/event-stream` с сообщениями из каналов `channels`.
+    Работает только под ASGI-сервером.
+    """
+    response = StreamingHttpResponse(
+        _event_stream(channels), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Отключение буферизации ответа в nginx.
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,84 @@
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from actions.models import Action, ActionSummary
+
+
+class Command(BaseCommand):
+    """
+    Удаление действий старше горизонта хранения.
+
+    Записи обрабатываются пачками по диапазону первичного ключа, каждая пачка
+    в своей короткой транзакции, чтобы не держать блокировку записи SQLite.
+    Перед удалением пачки её действия сворачиваются в `ActionSummary`
+    (помесячно, по пользователю и глаголу).
+    """
+    help = "Удаляет старые действия, сохраняя помесячную сводку."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int,
+            default=getattr(settings, "ACTIONS_RETENTION_DAYS", 365),
+            help="Сколько дней хранить действия."
+        )
+        parser.add_argument(
+            "--batch-size", type=int,
+            default=getattr(settings, "ACTIONS_PRUNE_BATCH_SIZE", 500),
+            help="Количество записей в одной транзакции."
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Только посчитать записи для удаления."
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        expired = Action.objects.filter(created__lt=cutoff).order_by("id")
+        if options["dry_run"]:
+            self.stdout.write(f"К удалению: {expired.count()} действий.")
+            return
+
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id).values_list(
+                    "id", flat=True
+                )[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            total += self.prune_batch(expired, ids[0], ids[-1])
+            last_id = ids[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f"Удалено {total} действий до {cutoff:%Y-%m-%d}.")
+        )
+
+    def prune_batch(self, expired, first_id, last_id):
+        """
+        Сворачивает действия с id из диапазона [first_id, last_id] в сводку
+        и удаляет их. Возвращает количество удалённых записей.
+        """
+        batch = expired.filter(id__gte=first_id, id__lte=last_id)
+        with transaction.atomic():
+            rollup = batch.annotate(
+                month=TruncMonth("created")
+            ).values("month", "user_id", "verb").annotate(
+                total=Count("id")
+            ).order_by()
+            for row in rollup:
+                month = row["month"].date()
+                updated = ActionSummary.objects.filter(
+                    month=month, user_id=row["user_id"], verb=row["verb"]
+                ).update(count=F("count") + row["total"])
+                if not updated:
+                    ActionSummary.objects.create(
+                        month=month, user_id=row["user_id"],
+                        verb=row["verb"], count=row["total"]
+                    )
+            deleted, _ = batch.delete()
+        return deleted
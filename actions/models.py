@@ -26,3 +26,33 @@ class Action(models.Model):
         ordering = ("-created",)
         verbose_name = "Действие"
         verbose_name_plural = "Действия"
+
+
+class ActionSummary(models.Model):
+    """
+    Помесячная сводка действий пользователя по глаголу. Заполняется командой
+    `prune_actions` перед удалением старых записей `Action`, чтобы статистика
+    за прошлые периоды оставалась доступной.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="action_summaries",
+        on_delete=models.CASCADE
+    )
+    verb = models.CharField(max_length=255)
+    month = models.DateField(verbose_name="Месяц")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("month", "user", "verb"),
+                name="unique_action_summary"
+            ),
+        )
+        ordering = ("-month",)
+        verbose_name = "Сводка действий"
+        verbose_name_plural = "Сводки действий"
+
+    def __str__(self):
+        return f"{self.user} {self.verb} {self.month:%Y-%m}: {self.count}"
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from account.models import Profile
+from images.models import Image
+from .models import Action
+from .utils import invalidate_fragments
+
+User = get_user_model()
+
+@receiver(post_save, sender=Profile)
+def profile_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Сброс кэша фрагментов действий пользователя при смене фото (в них
+    выводится уменьшенная копия, её сохраняет `apply_variants`).
+    """
+    if not update_fields or not {"photo_small", "photo_medium"} & set(
+        update_fields
+    ):
+        return
+    invalidate_fragments(Action.objects.filter(user_id=instance.user_id))
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def target_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Сброс кэша фрагментов действий, целью которых является изображение.
+    Обновление только счётчика лайков на фрагменты не влияет.
+    """
+    if update_fields and set(update_fields) <= {"total_likes"}:
+        return
+    invalidate_fragments(Action.objects.filter(
+        target_ct=ContentType.objects.get_for_model(Image),
+        target_id=instance.id
+    ))
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, **kwargs):
+    """
+    Сброс кэша фрагментов действий, где пользователь - автор или цель
+    (в них выводится его имя).
+    """
+    # Старое имя записывает обработчик pre_save в account.signals.
+    if not getattr(instance, "old_username", None):
+        return
+    invalidate_fragments(Action.objects.filter(
+        Q(user_id=instance.id)
+        | Q(target_ct=ContentType.objects.get_for_model(User),
+            target_id=instance.id)
+    ))
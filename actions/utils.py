@@ -1,6 +1,12 @@
 import datetime
+from django.conf import settings
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.contrib.contenttypes.models import ContentType
+from django.template.loader import render_to_string
+from social_website.redis_client import guarded_cache
+from .events import publish, feed_channel
 from .models import Action
 
 def create_action(user, verb, target=None):
@@ -12,18 +18,128 @@ def create_action(user, verb, target=None):
     """
     now = timezone.now()
     last_minute = now - datetime.timedelta(seconds=60)
+    similar_actions = Action.objects.filter(
+        user_id=user.id, verb=verb, created__gte=last_minute
+    )
     if target:
         target_ct = ContentType.objects.get_for_model(target)
-        similar_actions = Action.objects.filter(
+        similar_actions = similar_actions.filter(
             target_ct=target_ct,
             target_id=target.id
         )
-    else:
-        similar_actions = Action.objects.filter(
-            user_id=user.id, verb=verb, created__gte=last_minute
-        )
     if not similar_actions:
         action = Action(user=user, verb=verb, target=target)
         action.save()
+        if settings.EVENTS_ENABLED:
+            publish(
+                feed_channel(user.id), {"html": render_actions([action])[0]}
+            )
         return True
-    return False
\ No newline at end of file
+    return False
+
+def coalesce_actions(actions, limit=10, window=datetime.timedelta(hours=24),
+                     sample_size=3):
+    """
+    Группировка одинаковых действий ленты (одинаковый глагол и цель) в одну
+    запись вида "X и ещё N понравилось Y".
+
+    Обрабатывает уже выбранное окно действий (отсортированных по убыванию
+    даты), поэтому работает за один проход в памяти. В группу попадают
+    действия, созданные не раньше чем за `window` до самого нового действия
+    группы. Возвращает не более `limit` действий - по одному на группу.
+    Каждому действию добавляются атрибуты:
+        - `actors` - выборка из не более чем `sample_size` пользователей;
+        - `others_count` - сколько ещё пользователей не попало в выборку.
+    """
+    groups = {}
+    result = []
+    for action in actions:
+        key = None
+        if action.target_id is not None:
+            key = (action.verb, action.target_ct_id, action.target_id)
+        lead = groups.get(key) if key else None
+        if lead is not None and lead.created - action.created <= window:
+            if action.user_id not in lead.actor_ids:
+                lead.actor_ids.add(action.user_id)
+                if len(lead.actors) < sample_size:
+                    lead.actors.append(action.user)
+            continue
+        if len(result) == limit:
+            # Новые группы в ленту уже не поместятся, но существующие ещё
+            # могут пополниться более старыми действиями.
+            continue
+        action.actors = [action.user]
+        action.actor_ids = {action.user_id}
+        result.append(action)
+        if key:
+            groups[key] = action
+    for action in result:
+        action.others_count = len(action.actor_ids) - len(action.actors)
+    return result
+
+def fragment_key(action_id):
+    return f"action:{action_id}:html"
+
+def _fragment_signature(action):
+    """
+    Часть фрагмента, зависящая от группировки (см. `coalesce_actions`):
+    участники с именами, чтобы смена имени любого из них обновляла фрагмент.
+    """
+    actors = getattr(action, "actors", None)
+    if not actors:
+        return ""
+    return "-".join(
+        f"{user.id}:{user.username}" for user in actors
+    ) + f"+{action.others_count}"
+
+def render_actions(actions):
+    """
+    Возвращает отрисованные фрагменты `actions/detail.html` для действий.
+
+    Содержимое действия после создания не меняется, поэтому фрагменты
+    кэшируются по id действия на `ACTION_FRAGMENT_TIMEOUT` секунд и
+    читаются для всей страницы одним `get_many`. Связанные объекты
+    (профиль, цель) подгружаются только для отсутствующих в кэше действий.
+    Время действия выводится на клиенте, чтобы не зависеть от момента
+    отрисовки. Кэш сбрасывается сигналами при смене фото автора или
+    изменении цели (см. `actions.signals`).
+    """
+    keys = [fragment_key(action.id) for action in actions]
+    cached = guarded_cache(lambda cache: cache.get_many(keys), default={})
+    fragments = {}
+    missing = []
+    for key, action in zip(keys, actions):
+        signature, html = cached.get(key, (None, None))
+        if signature == _fragment_signature(action):
+            fragments[key] = html
+        else:
+            missing.append(action)
+    if missing:
+        prefetch_related_objects(missing, "user__profile", "target")
+        rendered = {
+            fragment_key(action.id): (
+                _fragment_signature(action),
+                render_to_string("actions/detail.html", {"action": action})
+            )
+            for action in missing
+        }
+        guarded_cache(
+            lambda cache: cache.set_many(
+                rendered, settings.ACTION_FRAGMENT_TIMEOUT
+            )
+        )
+        fragments.update(
+            (key, html) for key, (_, html) in rendered.items()
+        )
+    return [mark_safe(fragments[key]) for key in keys]
+
+def invalidate_fragments(actions):
+    """
+    Удаляет из кэша фрагменты действий из queryset `actions`.
+    """
+    keys = [
+        fragment_key(action_id)
+        for action_id in actions.values_list("id", flat=True)
+    ]
+    if keys:
+        guarded_cache(lambda cache: cache.delete_many(keys))
@@ -1,7 +1,16 @@
 from django.contrib import admin
-from .models import Image
+from social_website.paginators import CachedCountPaginator
+from .models import Image, ImageStats
 
 @admin.register(Image)
 class ImageAdmin(admin.ModelAdmin):
     list_display = ("title", "slug", "image", "created")
-    list_filter = ("created",)
+    date_hierarchy = "created"
+    raw_id_fields = ("user", "users_like")
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+@admin.register(ImageStats)
+class ImageStatsAdmin(admin.ModelAdmin):
+    list_display = ("image", "views", "updated")
+    raw_id_fields = ("image",)
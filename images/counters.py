@@ -0,0 +1,142 @@
+"""
+Счётчики просмотров и рейтинг изображений.
+
+`RedisCounters` - основная реализация, `MemoryCounters` - хранение в памяти
+процесса для разработки и тестов без сервера Redis. Реализация выбирается
+настройкой `IMAGE_COUNTERS_BACKEND` ("redis" или "memory").
+
+Методы, вызываемые из представлений (`incr_views`, `restore_views`, `top`),
+не выбрасывают исключений при недоступности хранилища: они возвращают None
+или пустой список. Методы для команд обслуживания (`scan_views`,
+`load_views`) ошибки пробрасывают.
+"""
+import threading
+from django.conf import settings
+from social_website.redis_client import get_redis, guarded
+
+RANKING_KEY = "image_ranking"
+
+
+def views_key(image_id):
+    return f"image:{image_id}:views"
+
+
+class RedisCounters:
+
+    def incr_views(self, image_id):
+        """
+        Увеличивает счётчик просмотров и рейтинг изображения.
+        Возвращает новое значение счётчика или None.
+        """
+        def operation(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.incr(views_key(image_id))
+            pipe.zincrby(RANKING_KEY, 1, image_id)
+            return pipe.execute()[0]
+        return guarded(operation)
+
+    def restore_views(self, image_id, views):
+        """
+        Добавляет к счётчику `views` просмотров (например, из снимка) и
+        выставляет рейтинг по итоговому значению. Возвращает его или None.
+        """
+        def operation(client):
+            total = client.incrby(views_key(image_id), views)
+            client.zadd(RANKING_KEY, {image_id: total})
+            return total
+        return guarded(operation)
+
+    def top(self, count):
+        """
+        Идентификаторы `count` самых просматриваемых изображений.
+        """
+        ranking = guarded(
+            lambda client: client.zrange(RANKING_KEY, 0, count - 1, desc=True),
+            default=[]
+        )
+        return [int(image_id) for image_id in ranking]
+
+    def scan_views(self, batch_size):
+        """
+        Перебирает счётчики пачками по SCAN, возвращая словари
+        {id изображения: просмотры}.
+        """
+        client = get_redis()
+        batch = []
+        for key in client.scan_iter(match=views_key("*"), count=batch_size):
+            batch.append(key)
+            if len(batch) == batch_size:
+                yield self._read_batch(client, batch)
+                batch = []
+        if batch:
+            yield self._read_batch(client, batch)
+
+    @staticmethod
+    def _read_batch(client, keys):
+        return {
+            int(key.split(b":")[1]): int(value)
+            for key, value in zip(keys, client.mget(keys))
+            if value is not None
+        }
+
+    def load_views(self, views):
+        """
+        Загружает счётчики {id: просмотры} конвейером, не перезаписывая
+        существующие значения.
+        """
+        pipe = get_redis().pipeline(transaction=False)
+        for image_id, count in views.items():
+            pipe.set(views_key(image_id), count, nx=True)
+            pipe.zadd(RANKING_KEY, {image_id: count}, nx=True)
+        pipe.execute()
+
+
+class MemoryCounters:
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def incr_views(self, image_id):
+        with self._lock:
+            self._views[image_id] = self._views.get(image_id, 0) + 1
+            return self._views[image_id]
+
+    def restore_views(self, image_id, views):
+        with self._lock:
+            self._views[image_id] = self._views.get(image_id, 0) + views
+            return self._views[image_id]
+
+    def top(self, count):
+        with self._lock:
+            ranking = sorted(
+                self._views, key=lambda image_id: -self._views[image_id]
+            )
+        return ranking[:count]
+
+    def scan_views(self, batch_size):
+        with self._lock:
+            items = list(self._views.items())
+        for start in range(0, len(items), batch_size):
+            yield dict(items[start:start + batch_size])
+
+    def load_views(self, views):
+        with self._lock:
+            for image_id, count in views.items():
+                self._views.setdefault(image_id, count)
+
+
+_counters = None
+
+
+def get_counters():
+    """
+    Счётчики процесса согласно настройке `IMAGE_COUNTERS_BACKEND`.
+    """
+    global _counters
+    if _counters is None:
+        if settings.IMAGE_COUNTERS_BACKEND == "memory":
+            _counters = MemoryCounters()
+        else:
+            _counters = RedisCounters()
+    return _counters
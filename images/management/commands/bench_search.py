@@ -0,0 +1,81 @@
+import random
+import sqlite3
+import time
+from django.core.management.base import BaseCommand
+from images.search import FTS_SCHEMA, FTS_TABLE, build_match_query
+
+
+class Command(BaseCommand):
+    """
+    Замер времени поиска в зависимости от размера таблицы.
+
+    Работает на синтетических данных во временной БД SQLite в памяти и
+    сравнивает полный просмотр `LIKE '%...%'` (аналог `icontains`) с
+    поиском по индексу FTS5 с сортировкой по bm25.
+    """
+    help = "Сравнивает задержку поиска LIKE и FTS5 на разных объёмах данных."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=(1000, 10000, 100000),
+            help="Размеры таблицы для замеров."
+        )
+        parser.add_argument(
+            "--queries", type=int, default=50,
+            help="Количество запросов на каждый размер."
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(0)
+        vocabulary = [
+            "".join(rnd.choice("абвгдеёжзиклмнопрстуфхцчшэюя")
+                    for _ in range(rnd.randint(4, 9)))
+            for _ in range(5000)
+        ]
+        self.stdout.write(
+            f"{'строк':>10} {'LIKE, мс':>12} {'FTS5, мс':>12}"
+        )
+        for size in options["sizes"]:
+            like_ms, fts_ms = self.measure(
+                rnd, vocabulary, size, options["queries"]
+            )
+            self.stdout.write(f"{size:>10} {like_ms:>12.3f} {fts_ms:>12.3f}")
+
+    def measure(self, rnd, vocabulary, size, queries):
+        db = sqlite3.connect(":memory:")
+        db.execute(
+            "CREATE TABLE image (id INTEGER PRIMARY KEY, title TEXT, "
+            "description TEXT)"
+        )
+        db.execute(FTS_SCHEMA)
+        rows = [
+            (i, " ".join(rnd.choices(vocabulary, k=4)),
+             " ".join(rnd.choices(vocabulary, k=30)))
+            for i in range(1, size + 1)
+        ]
+        db.executemany("INSERT INTO image VALUES (?, ?, ?)", rows)
+        db.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            "VALUES (?, ?, ?)", rows
+        )
+        words = rnd.choices(vocabulary, k=queries)
+
+        start = time.perf_counter()
+        for word in words:
+            db.execute(
+                "SELECT id FROM image WHERE title LIKE ? OR description "
+                "LIKE ? ORDER BY id DESC LIMIT 8",
+                (f"%{word}%", f"%{word}%")
+            ).fetchall()
+        like_ms = (time.perf_counter() - start) * 1000 / queries
+
+        start = time.perf_counter()
+        for word in words:
+            db.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? "
+                f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0) LIMIT 8",
+                (build_match_query(word),)
+            ).fetchall()
+        fts_ms = (time.perf_counter() - start) * 1000 / queries
+        db.close()
+        return like_ms, fts_ms
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from images.counters import get_counters
+from images.models import ImageStats
+
+
+class Command(BaseCommand):
+    """
+    Восстановление счётчиков просмотров и рейтинга в Redis из `ImageStats`.
+
+    Команды отправляются конвейером (pipeline) по пачкам. Уже существующие
+    в Redis значения не перезаписываются.
+    """
+    help = "Загружает счётчики просмотров из БД в Redis."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Количество записей в одном конвейере."
+        )
+
+    def handle(self, *args, **options):
+        counters = get_counters()
+        rows = ImageStats.objects.values_list("image_id", "views").iterator(
+            chunk_size=options["batch_size"]
+        )
+        batch = {}
+        total = 0
+        for image_id, views in rows:
+            batch[image_id] = views
+            if len(batch) == options["batch_size"]:
+                counters.load_views(batch)
+                total += len(batch)
+                batch = {}
+        counters.load_views(batch)
+        total += len(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f"Загружено счётчиков: {total}.")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from images.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Полная перестройка полнотекстового индекса изображений (FTS5).
+    """
+    help = "Перестраивает поисковый индекс изображений."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Количество записей в одной вставке."
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_index(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано изображений: {total}.")
+        )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from images.counters import get_counters
+from images.models import Image, ImageStats
+from social_website.versions import bump_version
+
+
+class Command(BaseCommand):
+    """
+    Сохранение счётчиков просмотров из Redis в таблицу `ImageStats`.
+
+    Ключи `image:<id>:views` перебираются командой SCAN пачками, значения
+    каждой пачки читаются одним MGET и записываются через `bulk_update`
+    (или `bulk_create` для изображений без снимка).
+    """
+    help = "Сохраняет счётчики просмотров из Redis в БД."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Количество ключей в одной пачке."
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for views in get_counters().scan_views(options["batch_size"]):
+            total += self.save_batch(views)
+        bump_version("image_stats")
+        self.stdout.write(
+            self.style.SUCCESS(f"Сохранено счётчиков: {total}.")
+        )
+
+    def save_batch(self, views):
+        now = timezone.now()
+        existing = ImageStats.objects.in_bulk(list(views))
+        for image_id, stats in existing.items():
+            stats.views = views[image_id]
+            stats.updated = now
+        ImageStats.objects.bulk_update(existing.values(), ("views", "updated"))
+        # Счётчики удалённых изображений пропускаются.
+        new_ids = Image.objects.filter(
+            id__in=set(views) - set(existing)
+        ).values_list("id", flat=True)
+        ImageStats.objects.bulk_create(
+            ImageStats(image_id=image_id, views=views[image_id], updated=now)
+            for image_id in new_ids
+        )
+        return len(existing) + len(new_ids)
@@ -63,3 +63,32 @@ class Image(models.Model):
 
     def __str__(self):
         return f"{self.title}"
+
+
+class ImageStats(models.Model):
+    """Снимок счётчиков просмотров изображения из Redis.
+
+    Заполняется командой `snapshot_image_stats` и используется для
+    восстановления счётчиков и рейтинга, если данные в Redis потеряны.
+
+    Attributes:
+        image: Изображение, к которому относится статистика.
+        views: Количество просмотров на момент последнего снимка.
+        updated: Дата и время последнего снимка.
+    """
+    image = models.OneToOneField(
+        Image,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    views = models.PositiveBigIntegerField(default=0, verbose_name="Просмотры")
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = (models.Index(fields=["-views"]),)
+        verbose_name = "Статистика изображения"
+        verbose_name_plural = "Статистика изображений"
+
+    def __str__(self):
+        return f"{self.image}: {self.views}"
@@ -0,0 +1,149 @@
+"""
+Полнотекстовый поиск по названиям и описаниям изображений.
+
+Индекс - виртуальная таблица SQLite FTS5, строки которой совпадают по rowid
+с `Image.id`. Таблица создаётся при первом обращении и поддерживается
+сигналами модели `Image`; полная перестройка - команда
+`rebuild_search_index`.
+"""
+import re
+from django.db import connection
+from .models import Image
+
+FTS_TABLE = "images_image_fts"
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, tokenize='unicode61 remove_diacritics 2')"
+)
+# Вес совпадений в названии относительно описания для bm25.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_index_ready = False
+
+
+def ensure_index():
+    """
+    Создаёт таблицу индекса, если её ещё нет (один раз на процесс).
+    """
+    global _index_ready
+    if not _index_ready:
+        with connection.cursor() as cursor:
+            cursor.execute(FTS_SCHEMA)
+        _index_ready = True
+
+
+def index_image(image):
+    """
+    Добавляет или обновляет изображение в индексе.
+    """
+    ensure_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [image.id])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            "VALUES (%s, %s, %s)",
+            [image.id, image.title, image.description]
+        )
+
+
+def remove_image(image_id):
+    """
+    Удаляет изображение из индекса.
+    """
+    ensure_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [image_id])
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Полностью перестраивает индекс по таблице изображений.
+    Возвращает количество проиндексированных записей.
+    """
+    ensure_index()
+    rows = Image.objects.order_by().values_list(
+        "id", "title", "description"
+    ).iterator(chunk_size=batch_size)
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                total += _insert_batch(cursor, batch)
+                batch = []
+        total += _insert_batch(cursor, batch)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return total
+
+
+def _insert_batch(cursor, rows):
+    cursor.executemany(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+        "VALUES (%s, %s, %s)",
+        rows
+    )
+    return len(rows)
+
+
+def build_match_query(query):
+    """
+    Преобразует пользовательский ввод в запрос FTS5: каждое слово ищется
+    как префикс, спецсимволы синтаксиса FTS5 отбрасываются.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+
+def parse_cursor(cursor):
+    """
+    Разбирает курсор вида "<ранг>:<id>". Возвращает None для пустого или
+    некорректного значения.
+    """
+    try:
+        score, image_id = cursor.rsplit(":", 1)
+        return float(score), int(image_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def search_images(query, after=None, limit=8):
+    """
+    Ищет изображения по запросу, сортируя по релевантности (bm25).
+
+    Пагинация - по ключу (ранг, id): `after` - курсор последнего элемента
+    предыдущей страницы. Возвращает список изображений и курсор следующей
+    страницы (None, если страница последняя).
+    """
+    match = build_match_query(query)
+    if not match:
+        return [], None
+    ensure_index()
+    sql = (
+        "SELECT id, score FROM ("
+        f"SELECT rowid AS id, bm25({FTS_TABLE}, %s, %s) AS score "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)"
+    )
+    params = [TITLE_WEIGHT, DESCRIPTION_WEIGHT, match]
+    position = parse_cursor(after)
+    if position:
+        sql += " WHERE score > %s OR (score = %s AND id > %s)"
+        params += [position[0], position[0], position[1]]
+    sql += " ORDER BY score, id LIMIT %s"
+    params.append(limit + 1)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][1]!r}:{rows[-1][0]}"
+    images = Image.objects.in_bulk([image_id for image_id, _ in rows])
+    return (
+        [images[image_id] for image_id, _ in rows if image_id in images],
+        next_cursor
+    )
@@ -1,8 +1,31 @@
-from django.db.models.signals import m2m_changed
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import receiver
+from social_website.versions import bump_version
 from .models import Image
+from . import search
+from .utils import image_cache
 
 @receiver(m2m_changed, sender=Image.users_like.through)
 def user_liked_changed(sender, instance, **kwargs):
     instance.total_likes = instance.users_like.count()
-    instance.save()
\ No newline at end of file
+    instance.save(update_fields=("total_likes",))
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def image_changed(sender, instance, **kwargs):
+    bump_version("images")
+    image_cache.invalidate_on_commit(instance.id)
+
+@receiver(post_save, sender=Image)
+def image_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Обновление поискового индекса. Сохранения, не затрагивающие название
+    и описание (например, счётчик лайков), индекс не трогают.
+    """
+    if update_fields and not {"title", "description"} & set(update_fields):
+        return
+    search.index_image(instance)
+
+@receiver(post_delete, sender=Image)
+def image_deleted(sender, instance, **kwargs):
+    search.remove_image(instance.id)
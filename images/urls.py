@@ -8,5 +8,10 @@ urlpatterns = [
     path("create/", views.create_image, name="create"),
     path("detail/<int:id>/<str:slug>/", views.image_detail, name="detail"),
     path("like/", views.image_like, name="like"),
+    path(
+        "detail/<int:id>/likes/stream/", views.like_stream,
+        name="like_stream"
+        ),
     path("ranking/", views.image_ranking, name="ranking"),
+    path("search/", views.image_search, name="search"),
 ]
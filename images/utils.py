@@ -0,0 +1,13 @@
+from social_website.model_cache import ModelCache
+from .models import Image
+
+
+def load_image(image_id):
+    # Владелец не подгружается: страница его не выводит, а в общий кэш не
+    # должны попадать строки пользователей (хэш пароля) и их устаревшие копии.
+    return Image.objects.filter(id=image_id).first()
+
+
+# Изображения по id (см. social_website.model_cache), инвалидируются
+# сигналами images.signals.
+image_cache = ModelCache("image", load_image)
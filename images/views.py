@@ -1,20 +1,25 @@
-from django.shortcuts import redirect, render, get_object_or_404
+from django.shortcuts import redirect, render
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, condition
 from .forms import ImageCreateForm
-from .models import Image
-from django.http import JsonResponse, HttpResponse
+from .models import Image, ImageStats
+from .search import search_images
+from django.http import Http404, JsonResponse, HttpResponse
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from actions.utils import create_action
-import redis
-from django.conf import settings
-
-red = redis.Redis(
-    host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB
+from actions.events import (
+    event_stream_response, events_available, events_unavailable_response,
+    like_channel, publish
     )
+from account.utils import refresh_user_counts, update_user_stats
+from social_website.ratelimit import ratelimit
+from social_website.versions import get_versions, page_etag
+from .counters import get_counters
+from .utils import image_cache
 
 @login_required
+@ratelimit("images.create")
 def create_image(request):
     """
     Представление для создания нового изображения с авторизацией.
@@ -43,6 +48,7 @@ def create_image(request):
             new_image = form.save(commit=False)
             new_image.user = request.user
             new_image.save()
+            update_user_stats(request.user.id, images_created=1)
             create_action(request.user, "Добавлено изображение", new_image)
             messages.success(request, "Изображение успешно добавлено!")
             return redirect(new_image.get_absolute_url())
@@ -71,16 +77,35 @@ def image_detail(request, id, slug):
     Raises:
         Http404: Если изображение с указанными id и slug не существует.
     """
-    image = get_object_or_404(Image, id=id, slug=slug)
-    total_views = red.incr(f"image:{image.id}:views")
-    red.zincrby("image_ranking", 1, image.id)
+    image = image_cache.get(id)
+    if image is None or image.slug != slug:
+        raise Http404("Изображение не найдено.")
+    counters = get_counters()
+    total_views = counters.incr_views(image.id)
+    if total_views is None or total_views == 1:
+        # Счётчик недоступен или его не было (возможно, данные были
+        # потеряны) - используем последний снимок.
+        stats = ImageStats.objects.filter(image=image).first()
+        if stats and stats.views:
+            if total_views is None:
+                total_views = stats.views
+            else:
+                total_views = counters.restore_views(
+                    image.id, stats.views
+                ) or stats.views + 1
     return render(
         request, "images/detail.html",
-        {"section": "images", "image": image, "total_views": total_views}
+        {
+            "section": "images",
+            "image": image,
+            "total_views": total_views,
+            "events_enabled": events_available(request),
+        }
         )
 
 @login_required
 @require_POST
+@ratelimit("images.like")
 def image_like(request):
     """
     Обрабатывает POST-запрос для лайка/дизлайка изображения.
@@ -112,12 +137,43 @@ def image_like(request):
                 create_action(request.user, "Понравилось", image)
             else:
                 image.users_like.remove(request.user)
+            # add() пропускает уже существующий лайк, поэтому при
+            # одновременных запросах счётчик пересчитывается, а не
+            # увеличивается.
+            refresh_user_counts("likes_given", [request.user.id])
+            publish(like_channel(image.id), {"likes": image.total_likes})
             return JsonResponse({"status": "ok"})
         except Image.DoesNotExist:
             pass
     return JsonResponse({"status": "error"})
 
 @login_required
+async def like_stream(request, id):
+    """
+    Поток Server-Sent Events с актуальным количеством лайков изображения.
+    Требует запуска под ASGI.
+
+    Args:
+        request (HttpRequest): Объект HTTP-запроса.
+        id (int): Идентификатор изображения.
+
+    Returns:
+        StreamingHttpResponse: Поток событий вида `{"likes": <число>}`
+        или ответ 503, если потоки недоступны (см. `events_available`).
+    """
+    if not events_available(request):
+        return events_unavailable_response()
+    return event_stream_response([like_channel(id)])
+
+def image_list_etag(request):
+    """
+    ETag списка изображений: версия коллекции изображений и пользователь,
+    для которого отрисована страница (шапка зависит от него).
+    """
+    return page_etag(request, get_versions("images"))
+
+@login_required
+@condition(etag_func=image_list_etag)
 def image_list(request):
     """
     Отображает список изображений с поддержкой пагинации и фильтрации.
@@ -164,15 +220,66 @@ def image_list(request):
     )
 
 @login_required
+def image_search(request):
+    """
+    Полнотекстовый поиск изображений по названию и описанию.
+
+    Результаты отсортированы по релевантности и выдаются страницами по
+    курсору: GET-параметр `after` - значение заголовка `X-Next-Cursor`
+    предыдущей страницы. С параметром `images_only` возвращается только
+    фрагмент `images/list_images.html` (пустая строка, если результатов нет).
+
+    Пример использования:
+        GET /images/search/?q=кот&images_only=1&after=-3.25:42
+    """
+    query = request.GET.get("q", "")
+    images, next_cursor = search_images(query, after=request.GET.get("after"))
+    if request.GET.get("images_only"):
+        if not images:
+            return HttpResponse("")
+        response = render(
+            request,
+            "images/list_images.html",
+            {"section": "images", "images": images}
+            )
+    else:
+        response = render(
+            request,
+            "images/search.html",
+            {
+                "section": "images", "images": images, "query": query,
+                "next_cursor": next_cursor
+            }
+        )
+    response["X-Next-Cursor"] = next_cursor or ""
+    return response
+
+def image_ranking_etag(request):
+    """
+    ETag рейтинга: состав первой десятки из Redis и версия изображений.
+    """
+    version = get_versions("images", "image_stats")
+    if version is None:
+        return None
+    ids = ",".join(str(id) for id in get_counters().top(10))
+    return page_etag(request, version, ids)
+
+@login_required
+@condition(etag_func=image_ranking_etag)
 def image_ranking(request):
-    image_ranking = red.zrange(
-        "image_ranking", 0, -1, desc=True
-    )[:10]
-    image_ranking_ids = [int(id) for id in image_ranking]
-    most_viewed = list(
-        Image.objects.filter(id__in=image_ranking_ids)
-    )
-    most_viewed.sort(key=lambda x: image_ranking_ids.index(x.id))
+    image_ranking_ids = get_counters().top(10)
+    if image_ranking_ids:
+        most_viewed = list(
+            Image.objects.filter(id__in=image_ranking_ids)
+        )
+        most_viewed.sort(key=lambda x: image_ranking_ids.index(x.id))
+    else:
+        # Рейтинг пуст или Redis недоступен - показываем
+        # последний сохранённый снимок.
+        most_viewed = [
+            stats.image for stats in
+            ImageStats.objects.select_related("image").order_by("-views")[:10]
+        ]
     return render(
         request, "images/ranking.html",
         {"section": "images", "most_viewed": most_viewed}
@@ -0,0 +1,5 @@
+import time
+
+# Момент начала импорта проекта: от него считается время импорта при прогреве
+# (см. social_website.warmup).
+STARTED_AT = time.perf_counter()
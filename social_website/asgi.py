@@ -2,6 +2,9 @@
 ASGI config for social_website project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The Server-Sent Events streams (``account:feed_stream``, ``images:like_stream``)
+are async views and need this entry point (e.g. ``uvicorn
+social_website.asgi:application``) to keep many idle connections per worker.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_website.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings
+
+if settings.WARMUP_ON_STARTUP:
+    from social_website.warmup import warm_up
+
+    warm_up()
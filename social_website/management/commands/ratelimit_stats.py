@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from social_website.ratelimit import rejected_counts
+
+
+class Command(BaseCommand):
+    """
+    Количество запросов, отклонённых ограничением частоты, по областям.
+    Берётся из Redis (по всем процессам) или, если он недоступен, только
+    для текущего процесса.
+    """
+    help = "Выводит количество отклонённых запросов по областям RATELIMITS."
+
+    def handle(self, *args, **options):
+        counts = rejected_counts()
+        if not counts:
+            self.stdout.write("Отклонённых запросов нет.")
+            return
+        for scope, count in sorted(counts.items()):
+            self.stdout.write(f"{scope:<20} {count:>10}")
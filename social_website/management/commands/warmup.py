@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from social_website.warmup import warm_up
+
+
+class Command(BaseCommand):
+    """
+    Прогрев процесса: шаблоны, кэши ContentType и URL, пул соединений
+    Redis. Выводит время каждого этапа для отслеживания регрессий запуска.
+    """
+    help = "Прогревает кэши процесса и выводит время этапов."
+
+    def handle(self, *args, **options):
+        total = 0
+        for name, seconds, result in warm_up():
+            total += seconds
+            self.stdout.write(
+                f"{name:<15} {seconds * 1000:>10.1f} мс"
+                + (f"  ({result})" if result is not None else "")
+            )
+        self.stdout.write(self.style.SUCCESS(f"Всего: {total * 1000:.1f} мс"))
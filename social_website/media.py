@@ -0,0 +1,154 @@
+"""
+Раздача медиафайлов с проверкой доступа.
+
+После проверки прав файл передаётся фронт-прокси (`MEDIA_ACCEL = "nginx"` -
+заголовок X-Accel-Redirect, `"sendfile"` - X-Sendfile для Apache/lighttpd).
+Без прокси (`MEDIA_ACCEL = None`) файл отдаётся самим Django с поддержкой
+Range-запросов, строгих ETag и ответов 304.
+
+Пример конфигурации nginx для `MEDIA_ACCEL_PREFIX = "/protected-media/"`:
+
+    location /protected-media/ {
+        internal;
+        alias /path/to/project/media/;
+    }
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(file_stat):
+    """
+    Строгий ETag из размера и времени изменения файла.
+    """
+    return f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном. Возвращает пару
+    (начало, конец включительно), None для отсутствующего или
+    неподдерживаемого заголовка и False для недостижимого диапазона.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    if size == 0:
+        return False
+    start, end = match.groups()
+    if start == "":
+        # Последние `end` байт файла.
+        length = int(end)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    """
+    Читает `length` байт файла начиная со `start`. Файл открывается только
+    при начале отдачи, поэтому не остаётся открытым, если ответ так и не
+    был прочитан.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@login_required
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("Файл не найден.")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("Файл не найден.")
+
+    etag = file_etag(file_stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(file_stat.st_mtime),
+        "Cache-Control": "private, max-age=86400",
+    }
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    if settings.MEDIA_ACCEL == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+    elif settings.MEDIA_ACCEL == "sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = full_path
+    else:
+        response = _file_response(
+            request, full_path, file_stat, etag, content_type
+        )
+        if encoding and response.status_code != 416:
+            response["Content-Encoding"] = encoding
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def _file_response(request, full_path, file_stat, etag, content_type):
+    """
+    Ответ с содержимым файла: целиком (200) или запрошенный диапазон (206).
+    """
+    size = file_stat.st_size
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range == etag:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(full_path, "rb"), content_type=content_type
+        )
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length),
+            status=206, content_type=content_type
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,149 @@
+"""
+Кэш объектов моделей со сквозным чтением (read-through).
+
+Объекты ищутся по естественному ключу сначала в LRU-кэше процесса с
+коротким временем жизни, затем в общем кэше Django и только потом
+загружаются из БД. Одновременные промахи по одному ключу загружают объект
+один раз: внутри процесса - под блокировкой ключа, между процессами - под
+блокировкой в общем кэше (`cache.add`), остальные ждут появления значения.
+
+Инвалидация (`invalidate`) удаляет запись из общего кэша и из кэша текущего
+процесса; в других процессах устаревшая копия живёт не дольше
+`MODEL_CACHE_LOCAL_TTL` секунд. Сигналы моделей вызывают
+`invalidate_on_commit`: до фиксации транзакции параллельный промах прочитал
+бы старую строку и снова положил её в кэш.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from .redis_client import guarded_cache
+
+LOCK_POLL_INTERVAL = 0.05
+# Значение `guarded_cache` при недоступности общего кэша.
+UNAVAILABLE = object()
+
+
+class LocalLRU:
+    """
+    LRU-кэш в памяти процесса с ограничением размера и временем жизни.
+    """
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class ModelCache:
+    """
+    Кэш объектов одного вида. `loader(key)` загружает объект из БД и
+    возвращает None, если его нет; отсутствие объекта не кэшируется.
+    """
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.local = LocalLRU(
+            settings.MODEL_CACHE_LOCAL_SIZE, settings.MODEL_CACHE_LOCAL_TTL
+        )
+        # Блокировки ключей удаляются вместе с последним ожидающим потоком.
+        self._key_locks = weakref.WeakValueDictionary()
+        self._key_locks_lock = threading.Lock()
+
+    def cache_key(self, key):
+        return f"model:{self.name}:{key}"
+
+    def get(self, key):
+        obj = self.local.get(key)
+        if obj is not None:
+            return obj
+        with self._key_lock(key):
+            obj = self.local.get(key)
+            if obj is None:
+                obj = self._fetch(key)
+                if obj is not None:
+                    self.local.set(key, obj)
+        return obj
+
+    def invalidate(self, key):
+        self.local.delete(key)
+        guarded_cache(lambda cache: cache.delete(self.cache_key(key)))
+
+    def invalidate_on_commit(self, key):
+        """
+        Инвалидация после фиксации текущей транзакции (вне транзакции -
+        сразу).
+        """
+        transaction.on_commit(lambda: self.invalidate(key))
+
+    def _key_lock(self, key):
+        with self._key_locks_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _fetch(self, key):
+        """
+        Объект из общего кэша или из БД. Загрузку выполняет только процесс,
+        захвативший блокировку в общем кэше; остальные ждут результат не
+        дольше `MODEL_CACHE_LOCK_TIMEOUT` секунд или до снятия блокировки,
+        после чего загружают объект сами.
+        """
+        cache_key = self.cache_key(key)
+        lock_key = f"{cache_key}:lock"
+        timeout = settings.MODEL_CACHE_LOCK_TIMEOUT
+        obj = guarded_cache(
+            lambda cache: cache.get(cache_key), default=UNAVAILABLE
+        )
+        if obj is UNAVAILABLE:
+            return self.loader(key)
+        if obj is not None:
+            return obj
+        locked = guarded_cache(lambda cache: cache.add(lock_key, 1, timeout))
+        if locked is False:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                obj = guarded_cache(lambda cache: cache.get(cache_key))
+                if obj is not None:
+                    return obj
+                if guarded_cache(lambda cache: cache.get(lock_key)) is None:
+                    # Загрузивший процесс не нашёл объект, завершился или
+                    # кэш стал недоступен.
+                    break
+        obj = self.loader(key)
+        if obj is not None:
+            guarded_cache(
+                lambda cache: cache.set(
+                    cache_key, obj, settings.MODEL_CACHE_TIMEOUT
+                )
+            )
+        if locked:
+            guarded_cache(lambda cache: cache.delete(lock_key))
+        return obj
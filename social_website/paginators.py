@@ -0,0 +1,34 @@
+import hashlib
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.core.exceptions import EmptyResultSet
+from django.utils.functional import cached_property
+from .redis_client import guarded_cache
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Пагинатор для списков админки на больших таблицах.
+
+    Количество записей (COUNT(*)) кэшируется по тексту SQL-запроса на
+    `ADMIN_COUNT_CACHE_TIMEOUT` секунд, поэтому точный подсчёт выполняется
+    не чаще одного раза за этот период для каждого набора фильтров.
+    Число страниц может ненадолго отставать от реального.
+    """
+    @cached_property
+    def count(self):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except (AttributeError, EmptyResultSet):
+            return super().count
+        digest = hashlib.md5(f"{sql}{params!r}".encode()).hexdigest()
+        key = f"admin_count:{digest}"
+        count = guarded_cache(lambda cache: cache.get(key))
+        if count is None:
+            count = super().count
+            guarded_cache(
+                lambda cache: cache.set(
+                    key, count, settings.ADMIN_COUNT_CACHE_TIMEOUT
+                )
+            )
+        return count
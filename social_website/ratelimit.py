@@ -0,0 +1,174 @@
+"""
+Ограничение частоты запросов по алгоритму token bucket.
+
+Корзины хранятся в Redis и изменяются атомарно Lua-скриптом. Если Redis
+недоступен (см. `social_website.redis_client`), используются корзины в
+памяти процесса. Лимиты задаются в настройке `RATELIMITS` в виде
+"<количество>/<s|m|h|d>" для каждой области (scope), например
+`{"images.like": "30/m"}`. Авторизованные пользователи ограничиваются
+по своей корзине, и, кроме того, все запросы - по корзине IP-адреса с
+лимитом в `RATELIMIT_IP_FACTOR` раз больше, чтобы пользователи за одним
+NAT или прокси не делили лимит одного пользователя.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from django.conf import settings
+from django.http import JsonResponse
+from .redis_client import guarded
+
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+REJECTED_KEY = "ratelimit:rejected"
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+def parse_rate(rate):
+    """
+    Разбирает строку вида "30/m" в пару (ёмкость корзины, токенов в секунду).
+    """
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / RATE_PERIODS[period]
+
+
+class MemoryTokenBuckets:
+    """
+    Корзины в памяти процесса: запасной вариант при недоступности Redis.
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.time()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True, 0
+            self._buckets[key] = (tokens, now)
+            return False, (1 - tokens) / rate
+
+
+class RedisTokenBuckets:
+
+    def __init__(self):
+        self._script = None
+
+    def consume(self, key, capacity, rate):
+        """
+        Списывает токен из корзины `key`. Возвращает пару (разрешено,
+        секунд до появления токена) или None, если Redis недоступен.
+        """
+        def operation(client):
+            if self._script is None:
+                self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, retry_after = self._script(
+                keys=(f"ratelimit:{key}",), args=(capacity, rate, time.time()),
+                client=client
+            )
+            return bool(allowed), float(retry_after)
+        return guarded(operation)
+
+
+redis_buckets = RedisTokenBuckets()
+memory_buckets = MemoryTokenBuckets()
+_rejected = Counter()
+
+
+def consume(key, capacity, rate):
+    result = redis_buckets.consume(key, capacity, rate)
+    if result is None:
+        result = memory_buckets.consume(key, capacity, rate)
+    return result
+
+
+def record_rejection(scope):
+    _rejected[scope] += 1
+    guarded(lambda client: client.hincrby(REJECTED_KEY, scope, 1))
+
+
+def rejected_counts():
+    """
+    Количество отклонённых запросов по областям: общее по всем процессам
+    из Redis или, если он недоступен, только текущего процесса.
+    """
+    counts = guarded(lambda client: client.hgetall(REJECTED_KEY))
+    if counts is None:
+        return dict(_rejected)
+    return {scope.decode(): int(count) for scope, count in counts.items()}
+
+
+def get_client_ip(request):
+    """
+    Адрес клиента из заголовка `RATELIMIT_IP_HEADER` доверенного прокси
+    (первый адрес списка) или из REMOTE_ADDR.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def ratelimit(scope, methods=("POST",)):
+    """
+    Декоратор представления: ограничивает частоту запросов методами
+    `methods` по лимиту `settings.RATELIMITS[scope]`. Корзины ведутся для
+    пользователя и (с увеличенным лимитом) для IP-адреса. При превышении
+    любой из них возвращает ответ 429 с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMITS.get(scope)
+            if rate and request.method in methods:
+                capacity, per_second = parse_rate(rate)
+                factor = settings.RATELIMIT_IP_FACTOR
+                buckets = [(
+                    f"{scope}:ip:{get_client_ip(request)}",
+                    capacity * factor, per_second * factor
+                )]
+                if request.user.is_authenticated:
+                    buckets.append(
+                        (f"{scope}:user:{request.user.id}", capacity,
+                         per_second)
+                    )
+                waits = [
+                    wait for allowed, wait in (
+                        consume(*bucket) for bucket in buckets
+                    ) if not allowed
+                ]
+                if waits:
+                    record_rejection(scope)
+                    response = JsonResponse(
+                        {"status": "error", "error": "rate_limited"},
+                        status=429
+                    )
+                    response["Retry-After"] = max(1, math.ceil(max(waits)))
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
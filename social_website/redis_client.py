@@ -0,0 +1,117 @@
+"""
+Общий клиент Redis для всего проекта.
+
+Соединения берутся из одного пула с таймаутами подключения и чтения.
+Подключение происходит лениво, при первой команде. Вызовы через `guarded`
+защищены автоматическим выключателем (circuit breaker): после нескольких
+ошибок подряд Redis не опрашивается в течение периода охлаждения, и запросы
+сразу получают значение по умолчанию вместо ожидания таймаута. Общий кэш
+Django работает с тем же сервером Redis, обращения к нему идут через
+`guarded_cache` и тот же выключатель.
+"""
+import threading
+import time
+import redis
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель.
+
+    После `failure_threshold` ошибок подряд размыкается на `cooldown`
+    секунд. По истечении охлаждения пропускает пробные вызовы: успешный
+    замыкает его, неудачный снова размыкает.
+    """
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return (
+            self._opened_at is not None
+            and time.monotonic() - self._opened_at < self.cooldown
+        )
+
+    def allow(self):
+        return not self.is_open
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+breaker = CircuitBreaker(
+    settings.REDIS_BREAKER_THRESHOLD, settings.REDIS_BREAKER_COOLDOWN
+)
+
+
+def get_pool():
+    """
+    Пул соединений процесса, создаётся при первом обращении.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = redis.ConnectionPool(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+                )
+    return _pool
+
+
+def get_redis():
+    """
+    Клиент Redis поверх общего пула. Сам по себе соединение не открывает.
+    """
+    return redis.Redis(connection_pool=get_pool())
+
+
+def guarded(operation, default=None):
+    """
+    Выполняет `operation(client)` через автоматический выключатель.
+
+    Возвращает `default`, если выключатель разомкнут или Redis ответил
+    ошибкой (включая таймаут).
+    """
+    return _call(lambda: operation(get_redis()), default)
+
+
+def guarded_cache(operation, default=None):
+    """
+    Выполняет `operation(cache)` с общим кэшем Django через автоматический
+    выключатель. Возвращает `default` так же, как `guarded`.
+    """
+    return _call(lambda: operation(cache), default)
+
+
+def _call(operation, default):
+    if not breaker.allow():
+        return default
+    try:
+        result = operation()
+    except redis.RedisError:
+        breaker.record_failure()
+        return default
+    breaker.record_success()
+    return result
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     # Мои приложения:
     "images.apps.ImagesConfig",
     "actions.apps.ActionsConfig",
+    "social_website", # Общие команды проекта
     # Сторонние библиотеки:
     "debug_toolbar",
     "social_django",
@@ -64,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                "account.context_processors.user_stats",
             ],
         },
     },
@@ -110,6 +112,15 @@ STATICFILES_DIRS = (BASE_DIR / "static",)
 
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Передача медиафайлов фронт-прокси после проверки доступа:
+# "nginx" (X-Accel-Redirect), "sendfile" (X-Sendfile) или None (сам Django)
+MEDIA_ACCEL = None
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+# Размеры нормализованных аватаров (сторона квадрата в пикселях)
+AVATAR_SIZES = {"small": 80, "medium": 180}
+# Фото больше этого размера (в байтах) обрабатываются в фоне
+AVATAR_SYNC_MAX_SIZE = 2 * 1024 * 1024
 
 # Default primary key field type
 
@@ -127,12 +138,19 @@ LOGOUT_URL = "account:logout"
 
 PASSWORD_RESET_TIMEOUT = 600 # Сколько работает ссылка сброса пароля в секудндах
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Письма складываются в очередь и отправляются командой send_outbox
+# через OUTBOX_SMTP_BACKEND
+EMAIL_BACKEND = "account.mail.OutboxEmailBackend"
+OUTBOX_SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60 # Задержка перед первым повтором в секундах
+# Время, на которое пачка закрепляется за обработчиком, в секундах
+OUTBOX_CLAIM_TIMEOUT = 600
 EMAIL_HOST = env("EMAIL_HOST")
 EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
-EMAIL_PORT = env("EMAIL_PORT")
-EMAIL_USE_SSL = env("EMAIL_USE_SSL")
+EMAIL_PORT = env.int("EMAIL_PORT")
+EMAIL_USE_SSL = env.bool("EMAIL_USE_SSL")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL")
 
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = env("GOOGLE_OAUTH2_KEY")
@@ -159,4 +177,69 @@ ABSOLUTE_URL_OVERRIDES = {
 
 REDIS_HOST = "localhost"
 REDIS_PORT = 6379
-REDIS_DB = 0
\ No newline at end of file
+REDIS_DB = 0
+# Таймауты (в секундах) и размер пула соединений с Redis
+REDIS_SOCKET_TIMEOUT = 0.5
+REDIS_CONNECT_TIMEOUT = 0.5
+REDIS_MAX_CONNECTIONS = 50
+# Сколько ошибок подряд размыкают выключатель и на сколько секунд
+REDIS_BREAKER_THRESHOLD = 3
+REDIS_BREAKER_COOLDOWN = 30
+
+# Ограничение частоты запросов: "<количество>/<s|m|h|d>" для каждой области
+RATELIMITS = {
+    "images.like": "30/m",
+    "images.create": "10/m",
+    "account.follow": "30/m",
+}
+# Во сколько раз лимит для одного IP-адреса больше лимита пользователя
+# (с одного адреса через NAT или прокси могут работать многие пользователи)
+RATELIMIT_IP_FACTOR = 10
+# Заголовок с адресом клиента от доверенного фронт-прокси, например
+# "HTTP_X_REAL_IP". None - адрес берётся из REMOTE_ADDR.
+RATELIMIT_IP_HEADER = None
+
+# Хранилище счётчиков просмотров: "redis" или "memory" (в пределах процесса)
+IMAGE_COUNTERS_BACKEND = "redis"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/1",
+        "OPTIONS": {
+            "socket_timeout": REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+        },
+    }
+}
+
+# Потоки событий SSE (лента, лайки). Работают только под ASGI-сервером,
+# под WSGI страницы их не открывают, а представления потоков отвечают 503.
+EVENTS_ENABLED = env.bool("EVENTS_ENABLED", default=False)
+
+# Брокер событий для потоков SSE: "redis" или "local" (в пределах процесса)
+EVENTS_BROKER = "redis"
+
+# Прогрев рабочего процесса при запуске (см. social_website.warmup)
+WARMUP_ON_STARTUP = not DEBUG
+
+# Кэш объектов моделей (см. social_website.model_cache): размер и время
+# жизни кэша процесса, время хранения в общем кэше и блокировки загрузки
+MODEL_CACHE_LOCAL_SIZE = 1000
+MODEL_CACHE_LOCAL_TTL = 5
+MODEL_CACHE_TIMEOUT = 300
+MODEL_CACHE_LOCK_TIMEOUT = 5
+
+# Наибольшее количество пользователей в одном запросе массовой подписки
+FOLLOW_BULK_MAX_IDS = 50
+
+# Время кэширования количества записей в списках админки, в секундах
+ADMIN_COUNT_CACHE_TIMEOUT = 300
+
+# Хранение действий пользователей (команда prune_actions)
+ACTIONS_RETENTION_DAYS = 365
+ACTIONS_PRUNE_BATCH_SIZE = 500
+# Сколько последних действий выбирается для группировки ленты
+FEED_WINDOW_SIZE = 50
+# Время хранения отрисованных фрагментов действий в кэше, в секундах
+ACTION_FRAGMENT_TIMEOUT = 60 * 60 * 24 * 30
\ No newline at end of file
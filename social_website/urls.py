@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from social_website.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,10 +25,8 @@ urlpatterns = [
     path("images/", include("images.urls", namespace="images")),
     path("social-auth/", include("social_django.urls", namespace="social")),
     path('__debug__/', include('debug_toolbar.urls')),
+    path(
+        f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media,
+        name="media"
+        ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )
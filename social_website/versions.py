@@ -0,0 +1,63 @@
+"""
+Номера версий коллекций для условных GET-запросов (ETag).
+
+Версия коллекции хранится в общем кэше и меняется при каждом изменении её
+данных (см. сигналы приложений). Значение по умолчанию - текущее время в
+наносекундах, поэтому после потери ключа версия не совпадёт ни с одной
+ранее выданной.
+"""
+import hashlib
+import time
+from .redis_client import guarded_cache
+
+
+def _key(name):
+    return f"version:{name}"
+
+
+def bump_version(*names):
+    """
+    Увеличивает версии перечисленных коллекций.
+    """
+    def bump(cache, name):
+        try:
+            cache.incr(_key(name))
+        except ValueError:
+            cache.set(_key(name), time.time_ns(), None)
+
+    for name in names:
+        guarded_cache(lambda cache: bump(cache, name))
+
+
+def get_versions(*names):
+    """
+    Возвращает строку с версиями коллекций или None, если кэш недоступен.
+    """
+    keys = [_key(name) for name in names]
+
+    def read(cache):
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                cache.add(key, time.time_ns(), None)
+                versions[key] = cache.get(key)
+        return "-".join(str(versions[key]) for key in keys)
+
+    return guarded_cache(read)
+
+
+def page_etag(request, version, *parts):
+    """
+    ETag страницы из версий коллекций `version`, текущего пользователя и
+    секрета CSRF-cookie. Страницы на основе base.html содержат CSRF-токен,
+    а секрет меняется при каждом входе, поэтому после повторного входа
+    закэшированная страница со старым токеном не получит ответ 304.
+    Возвращает None, если версии недоступны.
+    """
+    if version is None:
+        return None
+    csrf = hashlib.sha256(
+        request.META.get("CSRF_COOKIE", "").encode()
+    ).hexdigest()[:16]
+    parts = (version, request.user.id, csrf, *parts)
+    return "-".join(str(part) for part in parts)
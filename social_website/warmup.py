@@ -0,0 +1,96 @@
+"""
+Прогрев рабочего процесса перед приёмом запросов.
+
+Выполняет работу, которую иначе оплатили бы первые запросы после деплоя:
+компиляцию шаблонов проекта в кэширующий загрузчик, заполнение кэшей
+`ContentType` и URL-резолвера, создание пула соединений Redis.
+
+Соединения с БД не прогреваются: в Django они принадлежат потоку, и
+соединение, открытое в потоке импорта, запросам не достаётся. Соединения,
+открытые при прогреве, закрываются в его конце.
+
+Вызывается из `wsgi.py`/`asgi.py` при `WARMUP_ON_STARTUP = True` (модуль
+приложения импортируется уже в рабочем процессе, если сервер запущен без
+preload) и командой `manage.py warmup`.
+"""
+import logging
+import time
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+import social_website
+from .redis_client import guarded
+
+logger = logging.getLogger(__name__)
+
+
+def warm_templates():
+    """
+    Загружает все шаблоны из каталогов проекта (без шаблонов сторонних
+    пакетов). Возвращает количество шаблонов.
+    """
+    total = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory)
+            if not directory.is_relative_to(settings.BASE_DIR):
+                continue
+            for path in directory.rglob("*"):
+                if path.is_file():
+                    engine.get_template(
+                        path.relative_to(directory).as_posix()
+                    )
+                    total += 1
+    return total
+
+
+def warm_content_types():
+    return len(ContentType.objects.get_for_models(*apps.get_models()))
+
+
+def warm_urls():
+    """
+    Заполняет таблицы обратного разрешения URL корневого резолвера и всех
+    вложенных пространств имён. Возвращает количество записей.
+    """
+    resolvers = [get_resolver()]
+    total = 0
+    while resolvers:
+        resolver = resolvers.pop()
+        total += len(resolver.reverse_dict)
+        resolvers.extend(
+            sub_resolver for _, sub_resolver in resolver.namespace_dict.values()
+        )
+    return total
+
+
+def warm_redis():
+    return guarded(lambda client: client.ping(), default=False)
+
+
+STAGES = (
+    ("templates", warm_templates),
+    ("content_types", warm_content_types),
+    ("urls", warm_urls),
+    ("redis", warm_redis),
+)
+
+
+def warm_up():
+    """
+    Выполняет все этапы прогрева. Возвращает список кортежей
+    (этап, секунды, результат), первым идёт время импорта проекта.
+    """
+    report = [("import", time.perf_counter() - social_website.STARTED_AT, None)]
+    for name, stage in STAGES:
+        start = time.perf_counter()
+        result = stage()
+        report.append((name, time.perf_counter() - start, result))
+    connections.close_all()
+    for name, seconds, result in report:
+        logger.info("warmup %s: %.1f ms (%s)", name, seconds * 1000, result)
+    return report
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_website.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.WARMUP_ON_STARTUP:
+    from social_website.warmup import warm_up
+
+    warm_up()